@@ -1,5 +1,7 @@
 """Tests for repository analyzer module."""
 
+import os
+import tempfile
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -72,35 +74,19 @@ class TestRepositoryAnalyzer:
         # Using current date as fallback when git log is empty
         assert analyzer.data["metadata"]["updatedAt"] is not None
 
-    @patch("os.path.isdir")
-    @patch("os.walk")
-    @patch("os.path.isfile")
-    @patch("os.path.getsize")
-    def test_calculate_language_stats(
-        self, mock_getsize, mock_isfile, mock_walk, mock_isdir
-    ):
+    def test_calculate_language_stats(self):
         """Test calculation of language statistics."""
-        # Mock directory checks
-        mock_isdir.return_value = True
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
 
-        # Mock file system structure
-        mock_walk.return_value = [
-            ("/fake/repo", [], ["file1.py", "file2.py", "file3.js"]),
-        ]
+            # Create files with known sizes
+            for name, size in [("file1.py", 100), ("file2.py", 200), ("file3.js", 100)]:
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write("x" * size)
 
-        # Mock file checks
-        mock_isfile.return_value = True
-
-        # Mock file sizes
-        mock_getsize.side_effect = lambda path: {
-            "/fake/repo/file1.py": 100,
-            "/fake/repo/file2.py": 200,
-            "/fake/repo/file3.js": 100,
-        }.get(path, 0)
-
-        # Create analyzer and calculate language stats
-        analyzer = RepositoryAnalyzer("/fake/repo")
-        language_stats = analyzer._calculate_language_stats()
+            # Create analyzer and calculate language stats
+            analyzer = RepositoryAnalyzer(temp_dir)
+            language_stats = analyzer._calculate_language_stats()
 
         # Check language statistics
         assert len(language_stats) == 2
@@ -1,10 +1,15 @@
 """Extended tests for repository analyzer module - covering under-tested methods."""
 
+import io
+import json
+import os
+import tempfile
 from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
 
-from repo_visualizer.analyzer import RepositoryAnalyzer
+from repo_visualizer import analyzer as analyzer_module
+from repo_visualizer.analyzer import RepositoryAnalyzer, _ReadResult
 
 
 class TestRepositoryAnalyzerExtended:
@@ -31,6 +36,7 @@ class TestRepositoryAnalyzerExtended:
             capture_output=True,
             text=True,
             check=False,
+            close_fds=False,
         )
 
     @patch("os.path.isdir")
@@ -75,6 +81,20 @@ class TestRepositoryAnalyzerExtended:
 
         assert branch == "main"  # Default fallback
 
+    def test_get_default_branch_from_head_file(self):
+        """Test that the branch is read from .git/HEAD without running git."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            with open(os.path.join(temp_dir, ".git", "HEAD"), "w") as f:
+                f.write("ref: refs/heads/feature/branch\n")
+
+            analyzer = RepositoryAnalyzer(temp_dir)
+            with patch("subprocess.run") as mock_run:
+                branch = analyzer._get_default_branch()
+
+        assert branch == "feature/branch"
+        mock_run.assert_not_called()
+
     @patch("os.path.isdir")
     def test_sanitize_git_url(self, mock_isdir):
         """Test git URL sanitization."""
@@ -97,64 +117,83 @@ class TestRepositoryAnalyzerExtended:
         sanitized = analyzer._sanitize_git_url(url)
         assert sanitized == "https://github.com/user/repo.git"
 
-    @patch("os.path.isdir")
-    @patch("os.walk")
-    @patch("os.path.isfile")
-    @patch("os.path.getsize")
-    def test_calculate_language_stats_comprehensive(
-        self, mock_getsize, mock_isfile, mock_walk, mock_isdir
-    ):
+    def test_calculate_language_stats_comprehensive(self):
         """Test comprehensive language statistics calculation."""
-        mock_isdir.return_value = True
-        mock_isfile.return_value = True
-
-        # Mock file system with various file types
-        mock_walk.return_value = [
-            (
-                "/fake/repo",
-                [],
-                ["main.py", "utils.py", "app.js", "style.css", "README.md"],
-            ),
-        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            os.makedirs(os.path.join(temp_dir, "src"))
+
+            # File system with various file types, including a nested directory
+            files = {
+                "main.py": 1000,
+                "src/utils.py": 500,
+                "app.js": 800,
+                "style.css": 300,
+                "README.md": 200,
+                ".bashrc": 400,  # dotfile without an extension
+                "Makefile": 100,  # no extension
+            }
+            for name, size in files.items():
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write("x" * size)
+
+            analyzer = RepositoryAnalyzer(temp_dir)
+            stats = analyzer._calculate_language_stats()
+
+        # 1000 + 500 + 800 + 300 + 200 = 2800
+        assert stats["Python"] == pytest.approx(1500 / 2800, rel=1e-3)
+        assert stats["JavaScript"] == pytest.approx(800 / 2800, rel=1e-3)
+        assert stats["CSS"] == pytest.approx(300 / 2800, rel=1e-3)
+        assert stats["Markdown"] == pytest.approx(200 / 2800, rel=1e-3)
+        assert "BASHRC" not in stats
 
-        # Mock file sizes
-        mock_getsize.side_effect = lambda path: {
-            "/fake/repo/main.py": 1000,
-            "/fake/repo/utils.py": 500,
-            "/fake/repo/app.js": 800,
-            "/fake/repo/style.css": 300,
-            "/fake/repo/README.md": 200,
-        }.get(path, 0)
+    def test_calculate_language_stats_ignored_files(self):
+        """Test that gitignored files and directories are not counted."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            os.makedirs(os.path.join(temp_dir, "build"))
 
-        analyzer = RepositoryAnalyzer("/fake/repo")
-        analyzer.gitignore_spec = None  # type: ignore
-        analyzer._is_ignored = MagicMock(return_value=False)
+            with open(os.path.join(temp_dir, ".gitignore"), "w") as f:
+                f.write("build/\n*.log\n")
+            for name in ["main.py", "build/bundle.js", "debug.log"]:
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write("x" * 100)
 
-        stats = analyzer._calculate_language_stats()
+            analyzer = RepositoryAnalyzer(temp_dir)
+            stats = analyzer._calculate_language_stats()
 
-        1000 + 500 + 800 + 300 + 200  # 2800
+        assert stats == {"Python": 1.0}
 
-        assert stats["Python"] == pytest.approx(1500 / 2800, rel=1e-3)
-        assert stats["JavaScript"] == pytest.approx(800 / 2800, rel=1e-3)
-        assert stats["CSS"] == pytest.approx(300 / 2800, rel=1e-3)
-        assert stats["Markdown"] == pytest.approx(200 / 2800, rel=1e-3)
+    def test_walk_repo_shared_by_stats_and_files(self):
+        """Test that language stats and file analysis share one walk."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            os.makedirs(os.path.join(temp_dir, ".github", "workflows"))
+            os.makedirs(os.path.join(temp_dir, "src"))
 
-    @patch("os.path.isdir")
-    @patch("os.walk")
-    @patch("os.path.isfile")
-    @patch("os.path.getsize")
-    def test_calculate_language_stats_empty_repo(
-        self, mock_getsize, mock_isfile, mock_walk, mock_isdir
-    ):
-        """Test language statistics for empty repository."""
-        mock_isdir.return_value = True
-        mock_walk.return_value = []
+            for name in ["src/main.py", ".github/workflows/ci.yml"]:
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write("x" * 100)
 
-        analyzer = RepositoryAnalyzer("/fake/repo")
-        analyzer.gitignore_spec = None  # type: ignore
-        analyzer._is_ignored = MagicMock(return_value=False)
+            analyzer = RepositoryAnalyzer(temp_dir)
+            with patch("os.walk", wraps=os.walk) as mock_walk:
+                stats = analyzer._calculate_language_stats()
+                analyzer._analyze_files()
 
-        stats = analyzer._calculate_language_stats()
+        assert mock_walk.call_count == 1
+
+        # Hidden directories count towards language stats but aren't visualized
+        assert stats == {"Python": 0.5, "YAML": 0.5}
+        file_ids = {f["id"] for f in analyzer.data["files"]}
+        assert file_ids == {"src", "src/main.py"}
+
+    def test_calculate_language_stats_empty_repo(self):
+        """Test language statistics for empty repository."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+
+            analyzer = RepositoryAnalyzer(temp_dir)
+            stats = analyzer._calculate_language_stats()
 
         assert stats == {}
 
@@ -310,43 +349,48 @@ const functionExpression = function() {
         assert utils_dir["size"] == 500
 
     @patch("os.path.isdir")
-    @patch("subprocess.run")
-    def test_extract_file_git_metrics(self, mock_run, mock_isdir):
+    @patch("subprocess.Popen")
+    def test_extract_file_git_metrics(self, mock_popen, mock_isdir):
         """Test git metrics extraction for files."""
         mock_isdir.return_value = True
 
         analyzer = RepositoryAnalyzer("/fake/repo")
 
-        # Mock git log output
-        mock_run.side_effect = [
-            # First call: commit count
-            MagicMock(
-                returncode=0, stdout="abc123 Initial commit\ndef456 Update file\n"
-            ),
-            # Second call: last commit date
-            MagicMock(returncode=0, stdout="2023-12-01 10:00:00 +0000\n"),
-        ]
+        # Mock `git log -z --name-only --format=%x1e%aI` output, newest first
+        mock_process = MagicMock()
+        mock_process.stdout = io.BytesIO(
+            b"\x1e2023-12-01T10:00:00+01:00\0\nsrc/main.py\0README.md\0"
+            b"\x1e2023-11-30T09:00:00+00:00\0"  # merge commit, no files
+            b"\x1e2023-11-29T08:00:00+00:00\0\nsrc/main.py\0"
+        )
+        mock_process.wait.return_value = 0
+        mock_popen.return_value = mock_process
 
         metrics = analyzer._extract_file_git_metrics("src/main.py")
 
-        assert "commitCount" in metrics
         assert metrics["commitCount"] == 2
-        assert "lastCommitDaysAgo" in metrics
-        assert "lastCommitDate" in metrics
+        assert metrics["lastCommitDate"] == "2023-12-01T10:00:00+01:00"
+        assert metrics["lastCommitDaysAgo"] > 0
+
+        readme_metrics = analyzer._extract_file_git_metrics("README.md")
+        assert readme_metrics["commitCount"] == 1
+
+        # The history is read once for all files
+        assert mock_popen.call_count == 1
 
     @patch("os.path.isdir")
-    @patch("subprocess.run")
-    def test_extract_file_git_metrics_no_commits(self, mock_run, mock_isdir):
+    @patch("subprocess.Popen")
+    def test_extract_file_git_metrics_no_commits(self, mock_popen, mock_isdir):
         """Test git metrics extraction for files with no commits."""
         mock_isdir.return_value = True
 
         analyzer = RepositoryAnalyzer("/fake/repo")
 
         # Mock git log output with no commits
-        mock_run.side_effect = [
-            MagicMock(returncode=0, stdout=""),
-            MagicMock(returncode=1, stdout=""),
-        ]
+        mock_process = MagicMock()
+        mock_process.stdout = io.BytesIO(b"")
+        mock_process.wait.return_value = 128
+        mock_popen.return_value = mock_process
 
         metrics = analyzer._extract_file_git_metrics("src/new_file.py")
 
@@ -354,6 +398,91 @@ const functionExpression = function() {
         assert metrics["lastCommitDaysAgo"] == 0
         assert "lastCommitDate" in metrics
 
+    @patch("os.path.isdir")
+    @patch("subprocess.Popen")
+    def test_extract_commits(self, mock_popen, mock_isdir):
+        """Test streaming commit history extraction."""
+        mock_isdir.return_value = True
+
+        analyzer = RepositoryAnalyzer("/fake/repo")
+
+        # Mock streamed git log output
+        log_output = (
+            "abc123\x1fAlice <alice@example.com>\x1f"
+            "1701424800\x1fUpdate files\n"
+            "M\tsrc/main.py\n"
+            "A\tsrc/new.py\n"
+            "\n"
+            "def456\x1fBob <bob@example.com>\x1f"
+            "1701334800\x1fInitial commit\n"
+            "A\tsrc/main.py\n"
+        )
+        mock_popen.return_value = MagicMock(
+            stdout=io.StringIO(log_output), wait=MagicMock(return_value=0)
+        )
+
+        commits = analyzer._extract_commits()
+
+        assert [c["id"] for c in commits] == ["abc123", "def456"]
+        assert commits[0]["author"] == "Alice <alice@example.com>"
+        assert commits[0]["message"] == "Update files"
+        assert commits[0]["date"] == "2023-12-01T10:00:00+00:00"
+        assert commits[0]["fileChanges"] == [
+            {"fileId": "src/main.py", "type": "modify", "additions": 5, "deletions": 3},
+            {"fileId": "src/new.py", "type": "add", "additions": 10, "deletions": 0},
+        ]
+        assert len(commits[1]["fileChanges"]) == 1
+
+    @patch("os.path.isdir")
+    @patch("subprocess.Popen")
+    def test_extract_commits_git_failure(self, mock_popen, mock_isdir):
+        """Test commit extraction when git log fails."""
+        mock_isdir.return_value = True
+
+        analyzer = RepositoryAnalyzer("/fake/repo")
+
+        mock_popen.return_value = MagicMock(
+            stdout=io.StringIO(""), wait=MagicMock(return_value=128)
+        )
+
+        assert analyzer._extract_commits() == []
+
+    @patch("os.path.isdir")
+    @patch("subprocess.Popen")
+    def test_extract_commits_max_commits(self, mock_popen, mock_isdir):
+        """Test that the commit limit is passed to git log."""
+        mock_isdir.return_value = True
+
+        analyzer = RepositoryAnalyzer("/fake/repo")
+
+        mock_popen.return_value = MagicMock(
+            stdout=io.StringIO(""), wait=MagicMock(return_value=0)
+        )
+
+        analyzer._extract_commits(max_commits=5)
+
+        assert "--max-count=5" in mock_popen.call_args[0][0]
+
+    @patch("os.path.isdir")
+    @patch("subprocess.Popen")
+    def test_extract_commits_kills_git_on_parse_error(self, mock_popen, mock_isdir):
+        """Test that git log is killed and reaped if parsing fails midway."""
+        mock_isdir.return_value = True
+
+        analyzer = RepositoryAnalyzer("/fake/repo")
+
+        def lines():
+            yield "abc123\x1fAuthor\x1fa@example.com\x1f2024-01-01\x1fmsg\n"
+            raise OSError("boom")
+
+        stdout = MagicMock()
+        stdout.__iter__.return_value = lines()
+        mock_popen.return_value = MagicMock(stdout=stdout)
+
+        assert analyzer._extract_commits() == []
+        mock_popen.return_value.kill.assert_called_once()
+        mock_popen.return_value.wait.assert_called_once()
+
     @patch("os.path.isdir")
     def test_extract_python_semantic_content(self, mock_isdir):
         """Test Python semantic content extraction."""
@@ -446,27 +575,164 @@ function function_name() {
         assert "Hash comment" in content
         assert "defines function_name" in content
 
+    @pytest.mark.parametrize(
+        ("orjson_available", "ijson_available"),
+        [
+            (False, False),
+            pytest.param(
+                True,
+                False,
+                marks=pytest.mark.skipif(
+                    not analyzer_module.ORJSON_AVAILABLE, reason="orjson not installed"
+                ),
+            ),
+            pytest.param(
+                False,
+                True,
+                marks=pytest.mark.skipif(
+                    not analyzer_module.IJSON_AVAILABLE, reason="ijson not installed"
+                ),
+            ),
+        ],
+    )
+    def test_parse_js_coverage_summary(self, orjson_available, ijson_available):
+        """Test parsing coverage-summary.json with each JSON backend."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            os.makedirs(os.path.join(temp_dir, "coverage"))
+
+            summary = {
+                "total": {"lines": {"pct": 50}},
+                os.path.join(temp_dir, "src", "app.js"): {"lines": {"pct": 75}},
+                "src/utils.js": {"lines": {"pct": 100}},
+            }
+            summary_path = os.path.join(temp_dir, "coverage", "coverage-summary.json")
+            with open(summary_path, "w") as f:
+                json.dump(summary, f)
+
+            analyzer = RepositoryAnalyzer(temp_dir)
+            with patch.object(
+                analyzer_module, "ORJSON_AVAILABLE", orjson_available
+            ), patch.object(analyzer_module, "IJSON_AVAILABLE", ijson_available):
+                coverage = analyzer._parse_js_coverage()
+
+        assert coverage["src/app.js"] == pytest.approx(0.75)
+        assert coverage["src/utils.js"] == pytest.approx(1.0)
+
+    @pytest.mark.skipif(
+        not analyzer_module.IJSON_AVAILABLE, reason="ijson not installed"
+    )
+    def test_parse_js_coverage_summary_malformed(self, capsys):
+        """Test that a summary that fails partway through adds no coverage."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            os.makedirs(os.path.join(temp_dir, "coverage"))
+
+            summary_path = os.path.join(temp_dir, "coverage", "coverage-summary.json")
+            with open(summary_path, "w") as f:
+                f.write('{"src/app.js": {"lines": {"pct": 75}}, "src/utils.js": {')
+
+            analyzer = RepositoryAnalyzer(temp_dir)
+            coverage = analyzer._parse_js_coverage()
+
+        assert coverage == {}
+        assert "Error parsing coverage-summary.json" in capsys.readouterr().out
+
+    def test_parse_js_coverage_lcov(self):
+        """Test parsing lcov.info with absolute and relative source paths."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            os.makedirs(os.path.join(temp_dir, "coverage"))
+
+            abs_source = os.path.join(temp_dir, "src", "app.js")
+            lcov = (
+                f"SF:{abs_source}\nLF:4\nLH:3\nend_of_record\n"
+                "SF:src/utils.js\nLF:2\nLH:2\nend_of_record\n"
+            )
+            with open(os.path.join(temp_dir, "coverage", "lcov.info"), "w") as f:
+                f.write(lcov)
+
+            analyzer = RepositoryAnalyzer(temp_dir)
+            coverage = analyzer._parse_js_coverage()
+
+        assert coverage["src/app.js"] == pytest.approx(0.75)
+        assert coverage["src/utils.js"] == pytest.approx(1.0)
+
+    def test_read_file_content(self):
+        """Test reading file content for analysis."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            analyzer = RepositoryAnalyzer(temp_dir)
+
+            files = {
+                "text.py": b"def main():\r\n    pass\r\n",
+                "bom.py": b"\xef\xbb\xbfimport os\n",
+                "binary.bin": b"\x00\x01\x02\x03",
+                "large.txt": b"x" * (1024 * 1024 + 1),
+            }
+            for name, data in files.items():
+                with open(os.path.join(temp_dir, name), "wb") as f:
+                    f.write(data)
+
+            # Line endings are normalized like a text-mode read
+            content = analyzer._read_file_content(os.path.join(temp_dir, "text.py"))
+            assert content == "def main():\n    pass\n"
+
+            # A UTF-8 byte order mark is stripped
+            content = analyzer._read_file_content(os.path.join(temp_dir, "bom.py"))
+            assert content == "import os\n"
+
+            # Binary files and files over 1MB are skipped
+            assert (
+                analyzer._read_file_content(os.path.join(temp_dir, "binary.bin"))
+                is None
+            )
+            assert (
+                analyzer._read_file_content(os.path.join(temp_dir, "large.txt")) is None
+            )
+
     @patch("os.path.isdir")
-    def test_is_text_file(self, mock_isdir):
-        """Test text file detection."""
+    def test_analyze_file_content_skips_binary_extensions(self, mock_isdir):
+        """Test that known binary formats are not read."""
         mock_isdir.return_value = True
 
         analyzer = RepositoryAnalyzer("/fake/repo")
 
-        # Test with text content (no null bytes)
-        with patch("builtins.open", mock_open()) as mock_file:
-            mock_file.return_value.read.return_value = b"def main():\n    pass\n"
-            assert analyzer._is_text_file("/fake/file.py") is True
-
-        # Test with binary content (contains null bytes)
-        with patch("builtins.open", mock_open()) as mock_file:
-            mock_file.return_value.read.return_value = b"\x00\x01\x02\x03"
-            assert analyzer._is_text_file("/fake/file.bin") is False
-
-        # Test with file that raises exception
-        with patch("builtins.open", mock_open()) as mock_file:
-            mock_file.return_value.read.side_effect = OSError("File not found")
-            assert analyzer._is_text_file("/fake/file.txt") is False
+        with patch("builtins.open") as mock_file:
+            result = analyzer._analyze_file_content(
+                "/fake/repo/logo.PNG", "logo.PNG", "PNG"
+            )
+            prefetched = analyzer._prefetch_file_content("/fake/repo/logo.png")
+
+        assert result == ([], None)
+        assert prefetched is _ReadResult.SKIPPED
+        mock_file.assert_not_called()
+
+    def test_analyze_files_reads_skipped_files_once(self, capsys):
+        """Test that binary and unreadable files are read at most once, quietly."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            with open(os.path.join(temp_dir, "data.dat"), "wb") as f:
+                f.write(b"\0\1\2")
+            os.symlink(
+                os.path.join(temp_dir, "missing.py"),
+                os.path.join(temp_dir, "broken.py"),
+            )
+
+            analyzer = RepositoryAnalyzer(temp_dir)
+            with patch.object(
+                RepositoryAnalyzer,
+                "_read_file_content",
+                autospec=True,
+                side_effect=RepositoryAnalyzer._read_file_content,
+            ) as mock_read:
+                analyzer._analyze_files()
+
+        assert mock_read.call_count == 2
+        assert "Error" not in capsys.readouterr().out
+        files = {f["id"]: f for f in analyzer.data["files"]}
+        for file_id in ("data.dat", "broken.py"):
+            assert "linesOfCode" not in files[file_id].get("metrics", {})
 
     @patch("os.path.isdir")
     def test_save_to_file(self, mock_isdir):
@@ -113,6 +113,11 @@ sample/ignore_me/
                 analyzer._is_ignored("regular_file.py") is False
             )  # No rule to ignore this
 
+            # Without gitignore rules there's nothing to stat or match
+            with patch("os.path.isdir") as mock_isdir:
+                assert analyzer._is_ignored("src/module.py") is False
+            mock_isdir.assert_not_called()
+
     def test_respect_gitignore_in_file_scanning(self):
         """Test that file scanning respects gitignore patterns."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -155,6 +160,45 @@ sample/ignore_me/
             assert "ignored_dir" not in file_paths
             assert "ignored_dir/wont_be_seen.txt" not in file_paths
 
+    @pytest.mark.parametrize(
+        ("gitignore_content", "expect_fused"),
+        [
+            ("*.pyc\nbuild/\n/root.txt\ndocs/**/gen/\ntemp_?.txt\n", True),
+            ("*.pyc\n!keep.pyc\nbuild/\n", False),  # Negations need pathspec
+        ],
+    )
+    def test_fused_gitignore_regex_matches_pathspec(
+        self, gitignore_content, expect_fused
+    ):
+        """Test that the fused gitignore regex agrees with pathspec."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            with open(os.path.join(temp_dir, ".gitignore"), "w") as f:
+                f.write(gitignore_content)
+
+            analyzer = RepositoryAnalyzer(temp_dir)
+
+        assert (analyzer._gitignore_re is not None) is expect_fused
+
+        paths = [
+            "file.pyc",
+            "keep.pyc",
+            "src/keep.pyc",
+            "build/",
+            "src/build/",
+            "build",
+            "root.txt",
+            "src/root.txt",
+            "docs/a/b/gen/",
+            "docs/gen/",
+            "temp_1.txt",
+            "temp_12.txt",
+            "main.py",
+        ]
+        for path in paths:
+            expected = analyzer.gitignore_spec.match_file(path)
+            assert analyzer._match_gitignore(path) is expected, path
+
 
 if __name__ == "__main__":
     pytest.main(["-v", "test_gitignore.py"])
@@ -1,5 +1,8 @@
 """Tests for repository relationships functionality in analyzer module."""
 
+import ast
+import os
+import tempfile
 from unittest.mock import patch
 
 from repo_visualizer.analyzer import RepositoryAnalyzer
@@ -29,8 +32,6 @@ class TestRepositoryRelationships:
         ), patch("os.path.isfile", return_value=True), patch(
             "os.path.getmtime", return_value=1000000000
         ), patch("os.path.getctime", return_value=1000000000), patch.object(
-            RepositoryAnalyzer, "_is_text_file", return_value=True
-        ), patch.object(
             RepositoryAnalyzer, "_analyze_file_content", return_value=([], {})
         ):
             analyzer = RepositoryAnalyzer("/fake/repo")
@@ -92,8 +93,6 @@ class TestRepositoryRelationships:
         ), patch("os.path.isfile", return_value=True), patch(
             "os.path.getmtime", return_value=1000000000
         ), patch("os.path.getctime", return_value=1000000000), patch.object(
-            RepositoryAnalyzer, "_is_text_file", return_value=True
-        ), patch.object(
             RepositoryAnalyzer, "_analyze_file_content", return_value=([], {})
         ):
             analyzer = RepositoryAnalyzer("/fake/repo")
@@ -132,9 +131,9 @@ class TestRepositoryRelationships:
         """Test resolution of Python imports."""
         mock_isdir.return_value = True
 
-        # Setup analyzer with mocked file_ids
+        # Setup analyzer with mocked analyzed paths
         analyzer = RepositoryAnalyzer("/fake/repo")
-        analyzer.file_ids = {
+        analyzer._analyzed_paths = {
             "src",
             "src/main.py",
             "src/utils",
@@ -161,6 +160,51 @@ class TestRepositoryRelationships:
         paths = analyzer._resolve_python_import("src.utils.helpers", "test.py")
         assert "src/utils/helpers.py" in paths
 
+    def test_python_import_resolution_cache(self):
+        """Test that an import repeated within a directory is resolved once."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, ".git"))
+            os.makedirs(os.path.join(temp_dir, "src", "pkg"))
+            files = {
+                "src/main.py": "import pkg.helpers\n",
+                "src/other.py": "import pkg.helpers\n",
+                "src/pkg/helpers.py": "",
+            }
+            for name, content in files.items():
+                with open(os.path.join(temp_dir, name), "w") as f:
+                    f.write(content)
+
+            analyzer = RepositoryAnalyzer(temp_dir)
+            find_import_paths = RepositoryAnalyzer._find_python_import_paths
+            with patch.object(
+                RepositoryAnalyzer,
+                "_find_python_import_paths",
+                autospec=True,
+                side_effect=find_import_paths,
+            ) as mock_find:
+                analyzer._analyze_files()
+
+        # The second import from src/ is a cache hit
+        assert mock_find.call_count == 1
+
+        # The file name index is built once, not per analyzed file
+        py_files_by_name = analyzer._py_files_by_name
+        assert py_files_by_name is not None
+        assert py_files_by_name["helpers.py"] == ["src/pkg/helpers.py"]
+        assert analyzer._get_python_files_by_name() is py_files_by_name
+
+        # Both resolve, although src/pkg/ is walked after the importing files
+        for source in ("src/main.py", "src/other.py"):
+            key = (source, "src/pkg/helpers.py", "import")
+            assert analyzer.relationship_counts[key] == 1
+
+        # Callers get their own list, so mutating it doesn't corrupt the cache
+        paths = analyzer._resolve_python_import("pkg.helpers", "src/main.py")
+        paths.append("bogus")
+        assert analyzer._resolve_python_import("pkg.helpers", "src/main.py") == [
+            "src/pkg/helpers.py"
+        ]
+
     @patch("os.path.isdir")
     def test_file_component_relationships(self, mock_isdir):
         """Test creating relationships between files and components."""
@@ -250,7 +294,7 @@ class TestRepositoryRelationships:
 
         # Create analyzer
         analyzer = RepositoryAnalyzer("/fake/repo")
-        analyzer.file_ids = {"utils.py", "models.py", "config.py"}
+        analyzer._analyzed_paths = {"utils.py", "models.py", "config.py"}
 
         # Test with different import styles
         python_content = """
@@ -293,13 +337,100 @@ from config import settings as s
             # config is referenced 2 times: import models, config (comma-separated),
             # from config import settings as s
             assert ("test.py", "config.py", "import") in analyzer.relationship_counts
-            assert analyzer.relationship_counts[("test.py", "config.py", "import")] == 1
+            assert analyzer.relationship_counts[("test.py", "config.py", "import")] == 2
 
             # Check we have the expected relationship counts
             assert (
                 len(analyzer.relationship_counts) == 3
             )  # Three different target files
 
+    @patch("os.path.isdir")
+    def test_python_import_module_extraction(self, mock_isdir):
+        """Test module names extracted from Python imports."""
+        mock_isdir.return_value = True
+
+        analyzer = RepositoryAnalyzer("/fake/repo")
+
+        python_content = """
+import os, sys
+from ..pkg.mod import name
+from . import local
+
+try:
+    import numpy as np
+except ImportError:
+    from compat import numpy
+
+if TYPE_CHECKING:
+    from typing_only import Thing
+
+def func():
+    import lazy
+"""
+        modules = analyzer._extract_python_import_modules(python_content, "a/b.py")
+
+        assert modules == [
+            "os",
+            "sys",
+            "..pkg.mod",
+            ".",
+            "numpy",
+            "compat",
+            "typing_only",
+        ]
+
+    @patch("os.path.isdir")
+    def test_python_import_module_extraction_syntax_error(self, mock_isdir):
+        """Test that unparseable files fall back to the regex scan."""
+        mock_isdir.return_value = True
+
+        analyzer = RepositoryAnalyzer("/fake/repo")
+
+        # Python 2 print statement makes the file unparseable
+        python_content = """
+import utils, config
+from models import User
+print "hello"
+"""
+        modules = analyzer._extract_python_import_modules(python_content, "a.py")
+
+        assert modules == ["utils", "config", "models"]
+
+    @patch("os.path.isdir")
+    def test_python_import_module_extraction_no_imports(self, mock_isdir):
+        """Test that files without any import skip parsing."""
+        mock_isdir.return_value = True
+
+        analyzer = RepositoryAnalyzer("/fake/repo")
+
+        with patch("ast.parse") as mock_parse:
+            modules = analyzer._extract_python_import_modules("x = 1\n", "a.py")
+
+        assert modules == []
+        mock_parse.assert_not_called()
+
+    @patch("os.path.isdir")
+    def test_python_import_module_extraction_cached_by_content(self, mock_isdir):
+        """Test that identical file contents are only parsed once."""
+        mock_isdir.return_value = True
+
+        analyzer = RepositoryAnalyzer("/fake/repo")
+        content = "import os\nfrom . import utils\n"
+
+        with patch("ast.parse", wraps=ast.parse) as mock_parse:
+            first = analyzer._extract_python_import_modules(content, "a/x.py")
+            second = analyzer._extract_python_import_modules(content, "b/x.py")
+
+        assert first == second == ["os", "."]
+        assert mock_parse.call_count == 1
+
+        # Callers get their own list
+        first.append("mutated")
+        assert analyzer._extract_python_import_modules(content, "c/x.py") == [
+            "os",
+            ".",
+        ]
+
     @patch("os.path.isdir")
     def test_duplicate_relationship_counting(self, mock_isdir):
         """Test counting of duplicate relationships."""